@@ -10,6 +10,9 @@ import tiktoken
 import enum
 from src.tooling.tool_selectors import KeywordToolSelector
 from datetime import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+
+MAX_PARALLEL_TOOL_CALLS = 8  # Upper bound on worker threads for overlapping tool calls
 
 class MessageRole(enum.Enum):
     USER = "user"
@@ -46,6 +49,7 @@ class AgentCore:
         self.current_plan: Optional[ExecutionPlan] = None
         self.jumped = False # Flag for tracking jumps in plan execution
         self.step_callback = step_callback  # Add this line
+        self._prefetched_tool_results: dict[str, Future] = {}  # step_id -> result of a parallel tool call
 
     def execute_task(self, user_query:str, max_iterations: Optional[int] = None) -> str:
         """
@@ -179,6 +183,7 @@ class AgentCore:
             max_iterations = plan_data.get("max_iterations"),
             reasoning=plan_data.get("reasoning")
         )
+        self._prefetched_tool_results = {}
 
         # Determine iteration limit
         if max_iterations is None:
@@ -208,6 +213,10 @@ class AgentCore:
 
                 logger.info(f"Iteration {current_iteration}: Executing step {current_step.id} ({current_step.type})")
                 
+                # Overlap this tool call with any independent ones that directly follow it
+                if current_step.type == "tool" and current_step.id not in self._prefetched_tool_results:
+                    self._prefetch_parallel_tool_results(self.current_plan.current_step_index)
+                
                 # Execute the current step
                 success = self._execute_step(current_step)
 
@@ -346,8 +355,9 @@ class AgentCore:
 
         logger.info(f"Tool call for step {step.id}: {step.tool_name} with args {resolved_args}")
 
-        # Execute tool
-        result = tool.execute(resolved_args or {})
+        # Execute tool, or collect the result if it already ran as part of a parallel batch
+        prefetched = self._prefetched_tool_results.pop(step.id, None)
+        result = prefetched.result() if prefetched else tool.execute(resolved_args or {})
 
         # Store result
         step.result = str(result)
@@ -363,6 +373,59 @@ class AgentCore:
         
         return True
     
+    def _prefetch_parallel_tool_results(self, start_index: int):
+        """
+        Runs a batch of independent tool steps concurrently, starting at start_index.
+        
+        Only the tool calls overlap. Each step still goes through _execute_step in plan
+        order, which picks up its prefetched result, so outputs and history look as if the
+        steps had run one after another. This returns as soon as the calls are submitted:
+        each step's 'started' callback fires when it is reached, and waiting happens per
+        step on its own future.
+        """
+        batch = self._collect_parallel_tool_batch(start_index)
+        if len(batch) < 2:
+            return
+        
+        logger.info(f"Running {len(batch)} tool steps in parallel: {[step.id for step, _ in batch]}")
+        
+        executor = ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_TOOL_CALLS, len(batch)))
+        try:
+            for step, tool in batch:
+                resolved_args = self._resolve_tool_arguments(step.arguments, step.input_refs)
+                self._prefetched_tool_results[step.id] = executor.submit(tool.execute, resolved_args or {})
+        finally:
+            # Don't block on the batch; the workers exit once their calls finish
+            executor.shutdown(wait=False)
+    
+    def _collect_parallel_tool_batch(self, start_index: int) -> list[tuple[PlanStep, Any]]:
+        """
+        Collects the run of consecutive, not yet executed tool steps from start_index
+        whose tools are parallel-safe and which don't consume each other's outputs.
+        """
+        batch = []
+        batch_outputs = set()
+        
+        for step in self.current_plan.steps[start_index:]:
+            if step.type != "tool" or step.executed or not step.tool_name:
+                break
+            
+            tool = self.tool_registry.get_tool(step.tool_name)
+            if not tool or not tool.parallel_safe:
+                break
+            
+            # Stop at the first step that references an output produced inside the batch
+            refs = set(step.input_refs or [])
+            refs.update(value for value in (step.arguments or {}).values() if isinstance(value, str))
+            if refs & batch_outputs:
+                break
+            
+            batch.append((step, tool))
+            if step.output_name:
+                batch_outputs.add(step.output_name)
+        
+        return batch
+    
     def _execute_if_step(self, step: PlanStep) -> bool:
         """Executes a conditional step."""
         if not step.condition:
@@ -613,6 +676,17 @@ class AgentCore:
         """
         self.step_callback = callback
 
+    def reset_execution_state(self):
+        """
+        Clear everything left over from the last plan run, so the same instance
+        can execute another plan (e.g. when agents are pooled by the web API).
+        """
+        self.conversation_history = []
+        self.current_plan = None
+        self.jumped = False
+        self.step_callback = None
+        self._prefetched_tool_results = {}
+
     def _notify_callback(self, step_id: str, event_type: str, data: dict = None):
         """
         Notify callback if it exists.
@@ -34,6 +34,11 @@ class AppConfig:
     # Agent settings
     MAX_AGENT_ITERATIONS: int = 20
 
+    # Web interface settings (the Werkzeug debugger must never be exposed in production)
+    WEB_DEBUG: bool = os.getenv("WEB_DEBUG", "false").lower() in ("1", "true", "yes")
+    PLAN_CACHE_SIZE: int = 1024  # Plans remembered for repeated /api/plan queries
+    PLAN_CACHE_TTL: float = 600.0  # Seconds before a cached plan is planned again
+
     # For local models (example)
     LOCAL_MODEL_BASE_URL: str | None = os.getenv("LOCAL_MODEL_BASE_URL") # e.g., "http://localhost:11434/v1" for Ollama OpenAI-compatible API
     DEFAULT_LOCAL_MODEL_NAME: str | None = os.getenv("DEFAULT_LOCAL_MODEL_NAME")
@@ -16,7 +16,8 @@ class OpenAIInterface(BaseLLMInterface):
             model_name (str): The OpenAI model to use (e.g., "gpt-4", "gpt-3.5-turbo").
             api_key (Optional[str]): The OpenAI API key. If None, it will try to use
                                      the OPENAI_API_KEY environment variable.
-            **kwargs: Additional keyword arguments for OpenAI client or completion.
+            **kwargs: Additional keyword arguments for OpenAI client or completion
+                      (e.g., base_url, http_client).
         """
 
         resolved_api_key = api_key or settings.OPENAI_API_KEY
@@ -28,13 +29,21 @@ class OpenAIInterface(BaseLLMInterface):
         super().__init__(model_name=model_name, api_key=resolved_api_key, **kwargs)
 
         try:
+            client_kwargs = {"api_key": self.api_key}
+
             base_url = kwargs.get("base_url", None)
             if base_url:
                 print(f"Using custom OpenAI base URL: {base_url}")
-                self.client = OpenAI(api_key=self.api_key, base_url=base_url)
+                client_kwargs["base_url"] = base_url
             else:
                 print("Using default OpenAI base URL.")
-                self.client = OpenAI(api_key=self.api_key)
+
+            # A caller-provided httpx.Client lets several interfaces share one keep-alive pool
+            http_client = kwargs.get("http_client", None)
+            if http_client is not None:
+                client_kwargs["http_client"] = http_client
+
+            self.client = OpenAI(**client_kwargs)
 
             
             # You can also pass other OpenAI client options from self.config if needed
@@ -50,7 +59,8 @@ class OpenAIInterface(BaseLLMInterface):
         Args:
             messages (List[Dict[str, str]]): A list of message dictionaries.
             **kwargs: Additional keyword arguments for the OpenAI completion call
-                      (e.g., temperature, max_tokens, top_p).
+                      (e.g., temperature, max_tokens, top_p, extra_body for
+                      server-specific fields).
 
         Returns:
             Optional[str]: The LLM's response content as a string, or None if an error occurs.
@@ -72,7 +82,7 @@ class OpenAIInterface(BaseLLMInterface):
             request_data["response_format"] = {"type": "json_object"}
 
         # Ensure only valid OpenAI parameters are passed
-        valid_openai_params = {"temperature", "max_tokens", "top_p", "frequency_penalty", "presence_penalty", "stop","response_format"}
+        valid_openai_params = {"temperature", "max_tokens", "top_p", "frequency_penalty", "presence_penalty", "stop","response_format", "extra_body"}
 
         completion_kwargs = {k: v for k, v in request_data.items() if k in valid_openai_params and k not in ["model", "messages"]}
 
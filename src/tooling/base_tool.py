@@ -95,6 +95,17 @@ class BaseTool(ABC):
         """
         pass
 
+    @property
+    def parallel_safe(self) -> bool:
+        """
+        Whether this tool can run concurrently with other tool calls.
+        
+        Tools that only read state (or query an independent service) should return
+        True so the agent can overlap consecutive calls to them. Tools with side
+        effects whose order matters keep the default of False.
+        """
+        return False
+
     @abstractmethod
     def execute(self, args: dict) -> str:
         """
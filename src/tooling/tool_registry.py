@@ -4,21 +4,31 @@ from typing import List
 class ToolRegistry:
     def __init__(self):
         self._tools = {}  # Stores tool_name: tool_instance
+        self._tools_info = {}  # Stores tool_name: tool info, built once at registration
 
     def register_tool(self, tool: BaseTool):
         if tool.name in self._tools:
             print(f"Warning: Tool '{tool.name}' is already registered. Overwriting.")
         self._tools[tool.name] = tool
+        # Tool metadata is static, so build it here rather than on every lookup
+        self._tools_info[tool.name] = tool.get_tool_info()
         print(f"Tool '{tool.name}' registered.")
 
     def get_tool(self, tool_name: str) -> BaseTool | None:
         return self._tools.get(tool_name)
     
+    def get_tool_info(self, tool_name: str) -> dict | None:
+        """
+        Returns the cached schema for a registered tool, or None if it isn't registered.
+        The dict is shared between callers, so treat it as read-only.
+        """
+        return self._tools_info.get(tool_name)
+    
     def get_all_tools_info(self, tools: List[str] = None) -> list[dict]:
         """
         Returns a list of schemas for all registered tools.
         This is what you'd pass to the LLM in its system prompt.
         """
         if tools:
-            return [self._tools[tool_name].get_tool_info() for tool_name in tools if tool_name in self._tools]
-        return [tool.get_tool_info() for tool in self._tools.values()]
\ No newline at end of file
+            return [self._tools_info[tool_name] for tool_name in tools if tool_name in self._tools_info]
+        return list(self._tools_info.values())
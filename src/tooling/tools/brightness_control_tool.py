@@ -4,8 +4,12 @@
 """
 
 import subprocess
+import hashlib
 import json
-from typing import List
+import os
+import tempfile
+import threading
+from typing import Dict, List
 from src.tooling.base_tool import BaseTool
 from src.custom_logging import logger
 
@@ -13,12 +17,35 @@ DEFAULT_BRIGHTNESS_STEP = 2  # Default step for brightness adjustment
 DELAY_BETWEEN_STEPS = 0.1  # Delay between key presses in seconds
 COMMAND_FOR_BRIGHTNESS_INCREASE = "key code 144"  # Key code for brightness up
 COMMAND_FOR_BRIGHTNESS_DECREASE = "key code 145"  # Key code for brightness down
+VALID_ACTIONS = ("increase", "decrease")
+MIN_STEPS = 1
+MAX_STEPS = 16
+
+# Argument errors are fixed strings, so encode them once
+INVALID_ACTION_ERROR = json.dumps({"error": "Unknown action. Use 'increase' or 'decrease'."})
+INVALID_VALUE_ERROR = json.dumps({"error": f"Value must be an integer between {MIN_STEPS} and {MAX_STEPS}."})
+
+# AppleScript source compiled once with osacompile; the step count is passed as argv
+BRIGHTNESS_SCRIPT_TEMPLATE = """on run argv
+    tell application "System Events"
+        repeat (item 1 of argv as integer) times
+            {command}
+            delay {delay}
+        end repeat
+    end tell
+end run"""
 
 class BrightnessControlTool(BaseTool):
     """
     Tool for controlling macOS display brightness using keyboard simulation.
     """
 
+    def __init__(self):
+        self._compiled_scripts: Dict[str, str] = {}  # Stores action: path to compiled .scpt
+        self._osa = None  # Persistent `osascript -i` process shared by all calls
+        self._osa_lock = threading.Lock()
+        self._compile_lock = threading.Lock()  # Serializes first-use compiles across worker threads
+
     @property
     def name(self) -> str:
         return "brightness_control"
@@ -79,16 +106,22 @@ class BrightnessControlTool(BaseTool):
         action = args.get("action")
         value = args.get("value")
         
+        # Reject bad arguments before doing any work so they aren't reported as brightness failures
+        if action not in VALID_ACTIONS:
+            return INVALID_ACTION_ERROR
+        
+        if value is None:
+            steps = DEFAULT_BRIGHTNESS_STEP
+        elif isinstance(value, int) and not isinstance(value, bool) and MIN_STEPS <= value <= MAX_STEPS:
+            steps = value
+        else:
+            return INVALID_VALUE_ERROR
+        
         try:
             if action == "increase":
-                steps = int(value) if value is not None else DEFAULT_BRIGHTNESS_STEP
                 logger.info(f"Increasing brightness by {steps} steps")
                 return self._increase_brightness(steps)
-            elif action == "decrease":
-                steps = int(value) if value is not None else DEFAULT_BRIGHTNESS_STEP
-                return self._decrease_brightness(steps)
-            else:
-                return json.dumps({"error": f"Unknown action: {action}"})
+            return self._decrease_brightness(steps)
                 
         except Exception as e:
             return json.dumps({"error": f"Failed to control brightness: {str(e)}"})
@@ -98,17 +131,17 @@ class BrightnessControlTool(BaseTool):
         try:
             steps = max(1, min(16, steps)) * 2  # Each step is 2 key presses
 
-            script = f'tell application "System Events" to repeat {steps} times \n {COMMAND_FOR_BRIGHTNESS_INCREASE} \n delay {DELAY_BETWEEN_STEPS} \n end repeat'
+            script_path = self._get_compiled_script("increase", COMMAND_FOR_BRIGHTNESS_INCREASE)
 
             logger.info(f"Running AppleScript to increase brightness by {steps} steps")
             
-            subprocess.run(["osascript", "-e", script], 
-                          capture_output=True, text=True, check=True)
+            self._dispatch_script(script_path, steps)
             
             return json.dumps({
                 "success": True,
+                "status": "dispatched",
                 "steps": steps,
-                "message": f"Brightness increased by {steps} steps"
+                "message": f"Brightness increase by {steps} steps dispatched"
             })
             
         except subprocess.CalledProcessError as e:
@@ -122,19 +155,102 @@ class BrightnessControlTool(BaseTool):
         try:
             steps = max(1, min(16, steps)) * 2  # Each step is 2 key presses
             
-            script = f'tell application "System Events" to repeat {steps} times \n {COMMAND_FOR_BRIGHTNESS_DECREASE} \n delay {DELAY_BETWEEN_STEPS} \n end repeat'
+            script_path = self._get_compiled_script("decrease", COMMAND_FOR_BRIGHTNESS_DECREASE)
 
-            subprocess.run(["osascript", "-e", script],
-                           capture_output=True, text=True, check=True)
+            self._dispatch_script(script_path, steps)
 
             return json.dumps({
                 "success": True,
+                "status": "dispatched",
                 "steps": steps,
-                "message": f"Brightness decreased by {steps} steps"
+                "message": f"Brightness decrease by {steps} steps dispatched"
             })
             
         except subprocess.CalledProcessError as e:
             return json.dumps({
                 "error": f"Could not decrease brightness: {str(e)}",
                 "suggestion": "Grant accessibility permissions to Terminal in System Preferences"
-            })
\ No newline at end of file
+            })
+
+    def _get_compiled_script(self, action: str, command: str) -> str:
+        """
+        Return the path to the compiled .scpt for an action, compiling it on first use.
+        Running a compiled script skips AppleScript's source parse on every call.
+        """
+        script_path = self._compiled_scripts.get(action)
+        if script_path and os.path.exists(script_path):
+            return script_path
+
+        script = BRIGHTNESS_SCRIPT_TEMPLATE.format(command=command, delay=DELAY_BETWEEN_STEPS)
+        # Named after the source, so runs reuse one compiled file until the script changes
+        digest = hashlib.blake2b(script.encode(), digest_size=8).hexdigest()
+        script_path = os.path.join(self._get_script_dir(), f"brightness_{action}_{digest}.scpt")
+
+        with self._compile_lock:
+            if not os.path.exists(script_path):
+                logger.info(f"Compiling AppleScript for brightness {action} to {script_path}")
+                # A unique temporary name, renamed into place only once osacompile succeeds
+                fd, partial_path = tempfile.mkstemp(dir=os.path.dirname(script_path), suffix=".partial.scpt")
+                os.close(fd)
+                try:
+                    subprocess.run(["osacompile", "-o", partial_path, "-e", script],
+                                   capture_output=True, text=True, check=True)
+                    os.replace(partial_path, script_path)
+                finally:
+                    if os.path.exists(partial_path):
+                        os.remove(partial_path)
+
+        self._compiled_scripts[action] = script_path
+        return script_path
+
+    @staticmethod
+    def _get_script_dir() -> str:
+        """Per-user directory holding compiled scripts, shared by every process of that user."""
+        script_dir = os.path.join(tempfile.gettempdir(), f"brightness_control_{os.getuid()}")
+        os.makedirs(script_dir, mode=0o700, exist_ok=True)
+        if os.stat(script_dir).st_uid != os.getuid():
+            raise PermissionError(f"Compiled script directory is not owned by this user: {script_dir}")
+        return script_dir
+
+    def _dispatch_script(self, script_path: str, steps: int):
+        """
+        Send a compiled script to the persistent osascript session without waiting for it.
+        Brightness is a fire-and-forget side effect, so the agent loop should not block on
+        the key presses; failures are logged by the session's output reader.
+        """
+        command = f'run script (POSIX file "{script_path}") with parameters {{"{steps}"}}\n'
+
+        with self._osa_lock:
+            session = self._get_osa_session()
+            session.stdin.write(command)
+            session.stdin.flush()
+
+    def _get_osa_session(self) -> subprocess.Popen:
+        """
+        Return the long-lived interactive osascript process, starting it if needed.
+        Must be called with _osa_lock held.
+        """
+        if self._osa is None or self._osa.poll() is not None:
+            logger.info("Starting interactive osascript session")
+            self._osa = subprocess.Popen(["osascript", "-i"],
+                                         stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                         stderr=subprocess.STDOUT, text=True, bufsize=1)
+            threading.Thread(target=self._drain_osa_output, args=(self._osa,), daemon=True).start()
+        return self._osa
+
+    def _drain_osa_output(self, session: subprocess.Popen):
+        """Consume session output so the pipe never fills, logging any reported errors."""
+        for line in session.stdout:
+            line = line.strip()
+            if "error" in line.lower():
+                logger.error(f"osascript: {line} (grant accessibility permissions to Terminal in System Preferences)")
+        logger.info(f"Interactive osascript session exited with code {session.wait()}")
+
+    def __del__(self):
+        session = getattr(self, "_osa", None)
+        if session is not None and session.poll() is None:
+            try:
+                session.stdin.close()
+                session.terminate()
+            except OSError:
+                pass
\ No newline at end of file
@@ -1,8 +1,14 @@
-import json
-from datetime import datetime
+import time
 from src.tooling.base_tool import BaseTool
 from typing import List
 
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# The response shape is fixed and the formatted timestamp never needs JSON escaping,
+# so the payload is assembled from pre-encoded pieces instead of calling json.dumps
+_RESPONSE_PREFIX = '{"status": "success", "current_time": "'
+_RESPONSE_SUFFIX = '"}'
+
 class GetCurrentTimeTool(BaseTool):
     @property
     def name(self) -> str:
@@ -39,9 +45,12 @@ class GetCurrentTimeTool(BaseTool):
             "current_time": "string"
         }
     
+    @property
+    def parallel_safe(self) -> bool:
+        return True
+    
     def execute(self, args: dict) -> str:
         # args is expected to be an empty dict, but we don't strictly need to check it
         # if the input_schema is clear and LLM follows it.
-        now = datetime.now()
-        current_time_str = now.strftime("%Y-%m-%d %H:%M:%S")
-        return json.dumps({"status": "success", "current_time": current_time_str})
+        current_time_str = time.strftime(TIME_FORMAT, time.localtime())
+        return _RESPONSE_PREFIX + current_time_str + _RESPONSE_SUFFIX
@@ -1,10 +1,39 @@
 import json
 import fnmatch
-from pathlib import Path
-from typing import List, Dict, Any
+import functools
+import itertools
+import operator
+import os
+import re
+import stat
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 from src.tooling.base_tool import BaseTool
 
+# Detail groups returned when show_details is set; the first three require a stat call
+DETAIL_FIELDS = ("size", "modified", "permissions", "extension")
+STAT_DETAIL_FIELDS = frozenset(("size", "modified", "permissions"))
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+SIZE_UNITS = ("B", "KB", "MB", "GB", "TB", "PB")
+
+MAX_FILES = 20  # Hard limit for LLM context management
+MAX_MATCHES = MAX_FILES * 10  # Safety cap on matches gathered so sorting happens before truncating
+LISTING_CACHE_SIZE = 128  # Serialized listings kept per (path, directory mtime/ctime, arguments)
+JSON_SEPARATORS = (",", ":")  # Compact output; json (unlike orjson) escapes undecodable filenames
+
+@functools.lru_cache(maxsize=128)
+def _compile_pattern(pattern: str) -> re.Pattern:
+    """Translate a glob pattern into a case-insensitive regex, cached across calls."""
+    return re.compile(fnmatch.translate(pattern), re.IGNORECASE)
+
 class ListFilesTool(BaseTool):
+    def __init__(self):
+        self._listing_cache: OrderedDict = OrderedDict()  # (mtime_ns, ctime_ns, args) -> JSON, oldest first
+        self._listing_cache_lock = threading.Lock()
+
     @property
     def name(self) -> str:
         return "list_files"
@@ -57,6 +86,7 @@ class ListFilesTool(BaseTool):
         - extensions: Filter by file extensions (e.g., ['.py', '.txt'])
         - show_hidden: Include hidden files/directories
         - show_details: Include file size, permissions, modification time
+        - detail_fields: Subset of details to include (e.g., ['size']); defaults to all
         - sort_by: Sort by 'name', 'size', 'modified', or 'type'
         """
     
@@ -90,6 +120,11 @@ class ListFilesTool(BaseTool):
                     "type": "boolean",
                     "description": "If true, include file details like size, permissions, and modification time."
                 },
+                "detail_fields": {
+                    "type": "array",
+                    "items": {"type": "string", "enum": list(DETAIL_FIELDS)},
+                    "description": "Which details to include when show_details is true. Defaults to all of them."
+                },
                 "sort_by": {
                     "type": "string",
                     "enum": ["name", "size", "modified", "type"],
@@ -109,11 +144,12 @@ class ListFilesTool(BaseTool):
             "files": "array"
         }
     
+    @property
+    def parallel_safe(self) -> bool:
+        return True
+    
     def execute(self, args: dict) -> str:
         try:
-            # Hard limit for LLM context management
-            MAX_FILES = 20
-            
             # Extract arguments with defaults
             path = args.get("path", ".")
             pattern = args.get("pattern", "*")  # Default to all files
@@ -121,163 +157,245 @@ class ListFilesTool(BaseTool):
             extensions = args.get("extensions", [])
             show_hidden = args.get("show_hidden", False)
             show_details = args.get("show_details", False)
+            detail_fields = args.get("detail_fields") or DETAIL_FIELDS
             sort_by = args.get("sort_by", "name")
             
-            # Convert to Path object and resolve
-            target_path = Path(path).resolve()
+            # Accept a single field name as well as a list of them
+            if isinstance(detail_fields, str):
+                detail_fields = [detail_fields]
+            detail_fields = frozenset(detail_fields)
+            unknown_fields = detail_fields.difference(DETAIL_FIELDS)
+            if unknown_fields:
+                return json.dumps({
+                    "status": "error",
+                    "message": f"Unknown detail_fields: {sorted(unknown_fields)}. Valid fields: {list(DETAIL_FIELDS)}"
+                }, separators=JSON_SEPARATORS)
+            
+            # Resolve to a canonical absolute path
+            target_path = os.path.realpath(path)
             
-            # Validate path exists
-            if not target_path.exists():
+            # One stat answers both existence and directory-ness (and gives the cache mtime)
+            try:
+                dir_stat = os.stat(target_path)
+            except (FileNotFoundError, NotADirectoryError):
                 return json.dumps({
                     "status": "error",
                     "message": f"Path does not exist: {target_path}"
-                })
+                }, separators=JSON_SEPARATORS)
             
-            if not target_path.is_dir():
+            if not stat.S_ISDIR(dir_stat.st_mode):
                 return json.dumps({
                     "status": "error",
                     "message": f"Path is not a directory: {target_path}"
-                })
+                }, separators=JSON_SEPARATORS)
             
-            # Collect files
-            files_data = self._collect_files(
-                target_path, show_hidden, show_details, extensions, 
-                pattern, name_contains, MAX_FILES
-            )
+            listing_args = (target_path, pattern, name_contains, tuple(extensions),
+                            show_hidden, show_details, detail_fields, sort_by)
             
-            # Sort files
-            files_data = self._sort_files(files_data, sort_by)
-            
-            # Check if we hit the limit
-            truncated = len(files_data) >= MAX_FILES
-            
-            return json.dumps({
-                "status": "success",
-                "path": str(target_path),
-                "total_items": len(files_data),
-                "max_files": MAX_FILES,
-                "truncated": truncated,
-                "truncated_message": f"Results limited to {MAX_FILES} files. Use 'pattern' or 'name_contains' to narrow search." if truncated else None,
-                "search_criteria": {
-                    "pattern": pattern if pattern != "*" else None,
-                    "name_contains": name_contains if name_contains else None,
-                    "extensions": extensions if extensions else None
-                },
-                "files": files_data
-            }, indent=2)
+            # Stat-backed details and sort keys can change without touching the directory,
+            # so only entry-only listings are served from the cache
+            if self._needs_stat(show_details, detail_fields, sort_by):
+                return self._build_listing(*listing_args)
+            return self._cached_listing((dir_stat.st_mtime_ns, dir_stat.st_ctime_ns), listing_args)
             
         except PermissionError as e:
             return json.dumps({
                 "status": "error",
                 "message": f"Permission denied: {e}"
-            })
+            }, separators=JSON_SEPARATORS)
         except Exception as e:
             return json.dumps({
                 "status": "error",
                 "message": f"Unexpected error: {str(e)}"
-            })
+            }, separators=JSON_SEPARATORS)
+    
+    def _cached_listing(self, dir_version: tuple, listing_args: tuple) -> str:
+        """
+        Memoized _build_listing. The directory's mtime and ctime are part of the key, so
+        adding, removing or renaming an entry, or changing the directory's permissions,
+        produces a cache miss instead of a stale listing.
+        """
+        key = (dir_version, listing_args)
+        with self._listing_cache_lock:
+            listing = self._listing_cache.get(key)
+            if listing is not None:
+                self._listing_cache.move_to_end(key)
+                return listing
+        listing = self._build_listing(*listing_args)
+        with self._listing_cache_lock:
+            self._listing_cache[key] = listing
+            if len(self._listing_cache) > LISTING_CACHE_SIZE:
+                self._listing_cache.popitem(last=False)
+        return listing
+    
+    def _build_listing(self, target_path: str, pattern: str, name_contains: str,
+                       extensions: tuple, show_hidden: bool, show_details: bool,
+                       detail_fields: frozenset, sort_by: str) -> str:
+        """Collect, sort, truncate and serialize the listing for a validated directory."""
+        # Collect (sort key, file info) pairs; keys live beside the entries, not inside them
+        matches = self._collect_files(
+            target_path, show_hidden, show_details, detail_fields, sort_by,
+            extensions, pattern, name_contains, MAX_MATCHES
+        )
+        
+        # Sort all matches in place, then keep the first MAX_FILES
+        self._sort_files(matches, sort_by)
+        truncated = len(matches) > MAX_FILES
+        files_data = [file_info for _, file_info in matches[:MAX_FILES]]
+        
+        return json.dumps({
+            "status": "success",
+            "path": target_path,
+            "total_items": len(files_data),
+            "max_files": MAX_FILES,
+            "truncated": truncated,
+            "truncated_message": f"Results limited to {MAX_FILES} files. Use 'pattern' or 'name_contains' to narrow search." if truncated else None,
+            "search_criteria": {
+                "pattern": pattern if pattern != "*" else None,
+                "name_contains": name_contains if name_contains else None,
+                "extensions": extensions if extensions else None
+            },
+            "files": files_data
+        }, separators=JSON_SEPARATORS)
     
-    def _collect_files(self, path: Path, show_hidden: bool, show_details: bool, 
+    @staticmethod
+    def _needs_stat(show_details: bool, detail_fields: frozenset, sort_by: str) -> bool:
+        """Whether entries need a stat: for stat-backed details or size/modified sorting."""
+        return (show_details and not detail_fields.isdisjoint(STAT_DETAIL_FIELDS)) or sort_by in ("size", "modified")
+    
+    def _collect_files(self, path: str, show_hidden: bool, show_details: bool, 
+                      detail_fields: frozenset, sort_by: str,
                       extensions: List[str], pattern: str, name_contains: str, 
-                      max_files: int) -> List[Dict[str, Any]]:
-        """Collect file information from the specified path only (no recursion)."""
-        files_data = []
-        files_found = 0
+                      max_files: int) -> List[Tuple[Any, Dict[str, Any]]]:
+        """
+        Collect (sort key, file info) pairs for up to max_files matches in the specified
+        path only (no recursion).
+        """
+        # Normalize filters once per call instead of once per entry
+        pattern_regex = _compile_pattern(pattern) if pattern not in ("", "*") else None
+        name_contains_lower = name_contains.lower() if name_contains else None
+        extensions_lower = tuple(ext.lower() for ext in extensions) if extensions else None
         
-        def _should_include_file(item: Path) -> bool:
-            """Check if file should be included based on all filters."""
+        # Decide once whether entries need a stat
+        stat_details = show_details and not detail_fields.isdisjoint(STAT_DETAIL_FIELDS)
+        needs_stat = self._needs_stat(show_details, detail_fields, sort_by)
+        
+        def _should_include_file(name: str, name_lower: str) -> bool:
+            """Check if file should be included based on its name alone (no syscalls)."""
             # Skip hidden files if not requested
-            if not show_hidden and item.name.startswith('.'):
+            if not show_hidden and name.startswith('.'):
                 return False
             
-            # Apply pattern matching (case-insensitive)
-            if not fnmatch.fnmatch(item.name.lower(), pattern.lower()):
+            # Apply pattern matching (case-insensitive); '*' matches everything
+            if pattern_regex is not None and not pattern_regex.match(name):
                 return False
             
             # Apply name contains filter (case-insensitive)
-            if name_contains and name_contains.lower() not in item.name.lower():
+            if name_contains_lower and name_contains_lower not in name_lower:
                 return False
             
-            # Filter by extensions if specified (only for files)
-            if extensions and item.is_file():
-                if not any(item.name.lower().endswith(ext.lower()) for ext in extensions):
-                    return False
-            
             return True
         
-        try:
-            # Simple directory iteration - no recursion
-            items = path.iterdir()
-            
-            for item in items:
-                # Stop if we've found enough files
-                if files_found >= max_files:
-                    break
+        def _iter_matches():
+            """Yield (sort key, file info) for matching entries; scandir entries carry the file
+            type (and on Windows the stat data) from the directory read itself."""
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    # Lowercase once per entry; filters, extension check and sort key all share it
+                    name = entry.name
+                    name_lower = name.lower()
+                    if not _should_include_file(name, name_lower):
+                        continue
+                    
+                    # Determine the entry type once and reuse it for filtering and file info
+                    is_dir = entry.is_dir()
                     
-                if _should_include_file(item):
-                    file_info = self._get_file_info(item, show_details)
-                    files_data.append(file_info)
-                    files_found += 1
+                    # Filter by extensions if specified (only for files; is_file() is answered from
+                    # the cached d_type, and FIFOs, sockets and broken links are left unfiltered)
+                    if extensions_lower and not name_lower.endswith(extensions_lower) and entry.is_file():
+                        continue
                     
+                    # At most one stat per entry: DirEntry caches it, and is_dir() already
+                    # filled that cache for symlinks
+                    stat_info = None
+                    if needs_stat:
+                        try:
+                            stat_info = entry.stat()
+                        except OSError:
+                            pass
+                    
+                    # The same stat serves both the requested details and the size/modified sort key
+                    if sort_by == "size":
+                        sort_key = stat_info.st_size if stat_info else 0
+                    elif sort_by == "modified":
+                        sort_key = stat_info.st_mtime if stat_info else 0
+                    elif sort_by == "type":
+                        sort_key = (not is_dir, name_lower)  # Directories first
+                    else:
+                        sort_key = name_lower
+                    
+                    yield sort_key, self._get_file_info(entry, is_dir, stat_info, show_details,
+                                                        stat_details, detail_fields)
+        
+        try:
+            # Simple directory iteration - no recursion. islice stops the scan (and closes
+            # the directory handle) as soon as max_files matches are found
+            return list(itertools.islice(_iter_matches(), max_files))
         except PermissionError:
             # Skip directories we can't access
-            pass
-        
-        return files_data
+            return []
     
-    def _get_file_info(self, path: Path, show_details: bool) -> Dict[str, Any]:
-        """Extract information about a single file or directory."""
+    def _get_file_info(self, entry: os.DirEntry, is_dir: bool, stat_info: Optional[os.stat_result],
+                       show_details: bool, stat_details: bool, detail_fields: frozenset) -> Dict[str, Any]:
+        """Extract information about a single file or directory from its already-fetched stat."""
+        name = entry.name
         info = {
-            "name": path.name,
-            "path": str(path),
-            "type": "directory" if path.is_dir() else "file"
+            "name": name,
+            "path": entry.path,
+            "type": "directory" if is_dir else "file"
         }
         
         if show_details:
-            try:
-                stat_info = path.stat()
-                info.update({
-                    "size": stat_info.st_size,
-                    "size_human": self._human_readable_size(stat_info.st_size),
-                    "modified": stat_info.st_mtime,
-                    "modified_human": self._format_timestamp(stat_info.st_mtime),
-                    "permissions": oct(stat_info.st_mode)[-3:],
-                    "owner_readable": bool(stat_info.st_mode & 0o400),
-                    "owner_writable": bool(stat_info.st_mode & 0o200),
-                    "owner_executable": bool(stat_info.st_mode & 0o100)
-                })
-                
-                if path.is_file():
-                    info["extension"] = path.suffix
-                    
-            except (OSError, PermissionError):
+            if stat_details and stat_info is None:
                 info["details_error"] = "Permission denied or file not accessible"
+            elif stat_details:
+                # Only format the detail groups that were asked for
+                if "size" in detail_fields:
+                    info["size"] = stat_info.st_size
+                    info["size_human"] = self._human_readable_size(stat_info.st_size)
+                
+                if "modified" in detail_fields:
+                    info["modified"] = stat_info.st_mtime
+                    info["modified_human"] = self._format_timestamp(stat_info.st_mtime)
+                
+                if "permissions" in detail_fields:
+                    mode = stat_info.st_mode
+                    info["permissions"] = f"{mode & 0o777:03o}"
+                    info["owner_readable"] = (mode & 0o400) != 0
+                    info["owner_writable"] = (mode & 0o200) != 0
+                    info["owner_executable"] = (mode & 0o100) != 0
+            
+            if "extension" in detail_fields and entry.is_file():
+                info["extension"] = os.path.splitext(name)[1]
         
         return info
     
-    def _sort_files(self, files_data: List[Dict[str, Any]], sort_by: str) -> List[Dict[str, Any]]:
-        """Sort files based on the specified criteria."""
-        if sort_by == "name":
-            return sorted(files_data, key=lambda x: x["name"].lower())
-        elif sort_by == "size":
-            return sorted(files_data, key=lambda x: x.get("size", 0), reverse=True)
-        elif sort_by == "modified":
-            return sorted(files_data, key=lambda x: x.get("modified", 0), reverse=True)
-        elif sort_by == "type":
-            # Sort directories first, then files
-            return sorted(files_data, key=lambda x: (x["type"] == "file", x["name"].lower()))
-        else:
-            return files_data
+    def _sort_files(self, matches: List[Tuple[Any, Dict[str, Any]]], sort_by: str) -> None:
+        """Sort (sort key, file info) pairs in place based on the specified criteria."""
+        if sort_by in ("name", "type"):
+            matches.sort(key=operator.itemgetter(0))
+        elif sort_by in ("size", "modified"):
+            # Largest / most recent first
+            matches.sort(key=operator.itemgetter(0), reverse=True)
     
     def _human_readable_size(self, size_bytes: int) -> str:
         """Convert bytes to human readable format."""
-        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-            if size_bytes < 1024.0:
-                return f"{size_bytes:.1f} {unit}"
-            size_bytes /= 1024.0
-        return f"{size_bytes:.1f} PB"
+        if size_bytes <= 0:
+            return "0.0 B"
+        # Each unit is 2**10 of the previous, so the bit length picks the unit directly
+        index = min((size_bytes.bit_length() - 1) // 10, len(SIZE_UNITS) - 1)
+        return f"{size_bytes / (1 << (index * 10)):.1f} {SIZE_UNITS[index]}"
     
     def _format_timestamp(self, timestamp: float) -> str:
         """Format Unix timestamp to readable date."""
-        from datetime import datetime
-        return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
\ No newline at end of file
+        return time.strftime(TIMESTAMP_FORMAT, time.localtime(timestamp))
\ No newline at end of file
@@ -1,8 +1,22 @@
 import json
+import threading
+import httpx
 from typing import List, Optional
 from src.tooling.base_tool import BaseTool
 from src.llm_interface.openai_interface import OpenAIInterface
 
+JSON_SEPARATORS = (",", ":")  # Compact tool output, no pretty-printing
+
+# Calls to the local server come back-to-back, so keep a few connections warm
+LOCAL_LLM_CONNECTION_LIMITS = httpx.Limits(max_keepalive_connections=8)
+
+# Kept byte-identical across calls so the server can reuse the KV cache of the system prefix
+DEFAULT_SYSTEM_PROMPT = "You are a helpful assistant."
+
+# Server-side caching hints: llama.cpp reuses the cached prompt prefix with cache_prompt, and
+# Ollama keeps the model loaded for keep_alive. Servers ignore the fields they don't know.
+LOCAL_LLM_CACHE_OPTIONS = {"cache_prompt": True, "keep_alive": "30m"}
+
 class LocalLLMTool(BaseTool):
     """"
     A tool for interacting with local LLMs via HTTP API.
@@ -13,16 +27,23 @@ class LocalLLMTool(BaseTool):
         self.model_name = model_name
         self.base_url = base_url
         self._local_llm_interface = None
+        self._interface_lock = threading.Lock()
 
     @property
     def local_llm_interface(self) -> OpenAIInterface:
-        """Lazy initialization of local LLM interface."""
+        """
+        Lazy initialization of local LLM interface.
+        Built once with its own keep-alive HTTP client, which every later call reuses.
+        """
         if self._local_llm_interface is None:
-            self._local_llm_interface = OpenAIInterface(
-                model_name=self.model_name,
-                api_key="dummy",  # Local LLMs typically don't need API keys
-                base_url=self.base_url
-            )
+            with self._interface_lock:
+                if self._local_llm_interface is None:
+                    self._local_llm_interface = OpenAIInterface(
+                        model_name=self.model_name,
+                        api_key="dummy",  # Local LLMs typically don't need API keys
+                        base_url=self.base_url,
+                        http_client=httpx.Client(limits=LOCAL_LLM_CONNECTION_LIMITS)
+                    )
         return self._local_llm_interface
     
     @property
@@ -90,6 +111,10 @@ class LocalLLMTool(BaseTool):
             "message": "string"
         }
     
+    @property
+    def parallel_safe(self) -> bool:
+        return True
+    
     def execute(self, args: dict) -> str:
         try:
             query = args.get("query", "").strip()
@@ -102,11 +127,11 @@ class LocalLLMTool(BaseTool):
                 return json.dumps({
                     "status": "error",
                     "message": "Query is required for local LLM consultation"
-                })
+                }, separators=JSON_SEPARATORS)
             
             system_prompt = custom_system_prompt or self._get_default_system_prompt()
 
-            # Construct the full prompt
+            # Construct the full prompt; per-call context stays out of the system message
             full_prompt = self._construct_prompt(query, context)
 
             messages = [
@@ -118,7 +143,8 @@ class LocalLLMTool(BaseTool):
             response = self.local_llm_interface.get_completion(
                 messages=messages,
                 temperature=temperature,
-                max_tokens=max_tokens
+                max_tokens=max_tokens,
+                extra_body=LOCAL_LLM_CACHE_OPTIONS
             )
 
             if response:
@@ -127,24 +153,24 @@ class LocalLLMTool(BaseTool):
                     "response": response,
                     "model_used": self.model_name,
                     "processing": "local"
-                }, indent=2)
+                }, separators=JSON_SEPARATORS)
             
             else:
                 return json.dumps({
                     "status": "error",
                     "message": "No response received from local LLM",
                     "model_attempted": self.model_name,
-                })
+                }, separators=JSON_SEPARATORS)
             
         except Exception as e:
             return json.dumps({
                     "status": "error", 
                     "message": f"Error during local LLM usage: {str(e)}",
                     "model": self.model_name,
-                })
+                }, separators=JSON_SEPARATORS)
         
     def _get_default_system_prompt(self):
-        return """You are a helpful assistant."""
+        return DEFAULT_SYSTEM_PROMPT
     
     def _construct_prompt(self, query: str, context: str) -> str:
         """Consult the full prompt for the Local LLM Usage"""
@@ -1,17 +1,21 @@
-from flask import Flask, request, jsonify, render_template, Response
+from flask import Flask, request, render_template, Response
 from flask_cors import CORS
 from src.agent.agent_core import AgentCore
 from src.llm_interface.openai_interface import OpenAIInterface
 from src.tooling.tool_registry import ToolRegistry
 from src.tooling.tools import GetCurrentTimeTool, ListFilesTool, BrightnessControlTool, LocalLLMTool
 from src.config import settings
+import hashlib
+import sched
 import threading
 import uuid
-from datetime import datetime
-from typing import Dict, Any
-import queue
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
 import time
 import json
+import orjson
 
 
 
@@ -23,28 +27,337 @@ CORS(app)
 # Global agent instance for planning
 agent_instance = None
 
+_agent_init_lock = threading.Lock()
+
+# Idle execution agents reused across executions; AgentCore holds per-run state,
+# so each running execution still gets its own instance
+AGENT_POOL_SIZE = 16
+agent_pool: deque = deque()
+
+# /api/tools body, serialized once after tool registration (the registry is fixed at startup)
+tools_json_bytes: bytes = b''
+
+SSE_HEARTBEAT_INTERVAL = 15.0  # Seconds between heartbeats pushed to every open stream
+SSE_FLUSH_INTERVAL = 0.005  # Seconds a stream waits for more frames before writing a batch
+SSE_MAX_BATCH = 32  # Most frames written to a stream in one chunk
+HEARTBEAT_FRAME = b'data: {"type":"heartbeat"}\n\n'
+
+def dumps_json(data: Any) -> bytes:
+    """
+    Encode data with orjson, accepting non-string keys as json does. Input orjson
+    rejects outright (e.g. lone surrogates from undecodable filenames) falls back to json.
+    """
+    try:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        return json.dumps(data, separators=(",", ":")).encode()
+
+def sse_frame(data: Any) -> bytes:
+    """Encode data as a complete Server-Sent Events frame."""
+    return b"data: " + dumps_json(data) + b"\n\n"
+
+class SseChannel:
+    """
+    Update channel between one execution's worker thread and its SSE stream.
+    Encoded frames go into a deque (append/popleft are atomic in CPython) and an Event
+    wakes the stream, so it reacts to updates immediately instead of polling a queue.
+    A None entry marks the end of the stream.
+    Only the most recently attached stream reads; an EventSource reconnect supersedes
+    the old stream, which stops without taking frames meant for the new one.
+    """
+
+    def __init__(self):
+        self.buffer = deque()
+        self.event = threading.Event()
+        self.generation = 0
+        self._reader_lock = threading.Lock()
+
+    def put(self, frame: bytes):
+        self.buffer.append(frame)
+        self.event.set()
+
+    def close(self):
+        """Let the stream finish once it has sent every frame published so far."""
+        self.buffer.append(None)
+        self.event.set()
+
+    def attach(self) -> int:
+        """Make the calling stream the channel's reader; returns its generation for drain."""
+        with self._reader_lock:
+            self.generation += 1
+            generation = self.generation
+        # Wake the previous reader so it notices it has been superseded
+        self.event.set()
+        return generation
+
+    def drain(self, timeout: Optional[float], max_frames: int,
+              generation: int) -> Optional[List[Optional[bytes]]]:
+        """
+        Wait up to timeout (None: indefinitely) and return up to max_frames frames
+        (possibly none), or None if a newer stream has attached since generation.
+        """
+        self.event.wait(timeout)
+        with self._reader_lock:
+            if generation != self.generation:
+                # Keep the event set for the current reader
+                self.event.set()
+                return None
+            # Clear before draining: a frame appended after this point sets the event again
+            self.event.clear()
+            frames = []
+            while self.buffer and len(frames) < max_frames:
+                frames.append(self.buffer.popleft())
+            if self.buffer:
+                # Leave the rest for the next drain without waiting
+                self.event.set()
+            return frames
+
+class PlanCache:
+    """
+    Bounded, time-limited cache of execution plans keyed on the normalized query,
+    so repeating a query skips the planning LLM call.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, plan_data), oldest first
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(query: str) -> bytes:
+        # Only surrounding whitespace is dropped: queries may name case-sensitive paths
+        return hashlib.blake2b(query.strip().encode(), digest_size=16).digest()
+
+    def get(self, key: bytes) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, plan_data = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return plan_data
+
+    def put(self, key: bytes, plan_data: dict):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, plan_data)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+plan_cache = PlanCache(settings.PLAN_CACHE_SIZE, settings.PLAN_CACHE_TTL)
+
+STATE_SHARD_COUNT = 16  # Must be a power of two
+MAX_RETAINED_EXECUTIONS = 10_000  # Hard bound on executions held in memory
+EXECUTION_MAX_AGE = 3600  # Seconds after which an execution is evicted even if never cleaned up
+
+class ExecutionEntry:
+    """One execution's state and channel, plus a revision bumped on every state change."""
+    __slots__ = ('state', 'channel', 'created_at', 'revision', 'state_json')
+
+    def __init__(self, state: Dict[str, Any], channel: SseChannel, created_at: float):
+        self.state = state
+        self.channel = channel
+        self.created_at = created_at
+        self.revision = 0
+        self.state_json: Optional[bytes] = None  # Encoded state for the current revision
+
+    def changed(self):
+        self.revision += 1
+        self.state_json = None
+
+class ShardedStateStore:
+    """
+    Execution states and their SSE channels, split across lock-guarded shards.
+    Every read-modify-write of a state happens under its shard's lock, and requests
+    or workers touching different executions rarely share a lock.
+    The store is bounded: adding to a full shard, or one holding entries older than
+    max_age, evicts its oldest entries and closes their channels.
+    """
+
+    def __init__(self, shard_count: int = STATE_SHARD_COUNT,
+                 capacity: int = MAX_RETAINED_EXECUTIONS, max_age: float = EXECUTION_MAX_AGE):
+        self._shards = [({}, threading.Lock()) for _ in range(shard_count)]
+        self._mask = shard_count - 1
+        self._shard_capacity = max(1, capacity // shard_count)
+        self.max_age = max_age
+
+    def _shard(self, execution_id: str) -> tuple:
+        return self._shards[hash(execution_id) & self._mask]
+
+    def add(self, execution_id: str, state: Dict[str, Any], channel: SseChannel):
+        entries, lock = self._shard(execution_id)
+        now = time.monotonic()
+        evicted = []
+        with lock:
+            # Dicts keep insertion order, so the oldest entries are at the front
+            while entries:
+                oldest_id = next(iter(entries))
+                if len(entries) < self._shard_capacity and now - entries[oldest_id].created_at < self.max_age:
+                    break
+                evicted.append(entries.pop(oldest_id))
+            entries[execution_id] = ExecutionEntry(state, channel, now)
+        for evicted_entry in evicted:
+            evicted_entry.channel.close()
+
+    def remove(self, execution_id: str):
+        """Drop an execution and close its channel, so any stream still attached ends."""
+        entries, lock = self._shard(execution_id)
+        with lock:
+            entry = entries.pop(execution_id, None)
+        if entry is not None:
+            entry.channel.close()
+
+    def channels(self) -> List[SseChannel]:
+        """The channels of every execution currently held."""
+        channels = []
+        for entries, lock in self._shards:
+            with lock:
+                channels.extend(entry.channel for entry in entries.values())
+        return channels
+
+    def get_channel(self, execution_id: str) -> Optional[SseChannel]:
+        entries, lock = self._shard(execution_id)
+        with lock:
+            entry = entries.get(execution_id)
+        return entry.channel if entry else None
+
+    def state_json(self, execution_id: str) -> Optional[tuple]:
+        """
+        (revision, encoded state) for an execution, or None if it is gone. The encoding is
+        cached until the state next changes, so repeated polls reuse the same bytes.
+        """
+        entries, lock = self._shard(execution_id)
+        with lock:
+            entry = entries.get(execution_id)
+            if entry is None:
+                return None
+            if entry.state_json is None:
+                entry.state_json = dumps_json(entry.state)
+            return entry.revision, entry.state_json
+
+    def update(self, execution_id: str, fields: Dict[str, Any]) -> Optional[SseChannel]:
+        """Set fields on a state. Returns the execution's channel, or None if it is gone."""
+        entries, lock = self._shard(execution_id)
+        with lock:
+            entry = entries.get(execution_id)
+            if entry is None:
+                return None
+            entry.state.update(fields)
+            entry.changed()
+            return entry.channel
+
+    @contextmanager
+    def locked(self, execution_id: str):
+        """Hold the shard lock and yield the state (None if gone) for compound updates."""
+        entries, lock = self._shard(execution_id)
+        with lock:
+            entry = entries.get(execution_id)
+            if entry is None:
+                yield None
+                return
+            # Assume the caller changes the state
+            entry.changed()
+            yield entry.state
+
 # Global execution state management
-execution_states: Dict[str, Dict[str, Any]] = {}
-execution_queues: Dict[str, queue.Queue] = {}
+execution_store = ShardedStateStore()
+
+MAX_CONCURRENT_EXECUTIONS = 8  # Plans running at once; further executions wait in the pool's queue
+EXECUTION_RETENTION_SECONDS = 60  # How long a finished execution stays available to clients
+
+execution_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_EXECUTIONS,
+                                        thread_name_prefix="execution")
+
+# Planning runs off the request thread; clients poll /api/plan/<plan_id> for the result
+MAX_CONCURRENT_PLANS = 4  # Planning LLM calls in flight at once
+planning_executor = ThreadPoolExecutor(max_workers=MAX_CONCURRENT_PLANS,
+                                       thread_name_prefix="planning")
+plan_jobs: Dict[str, Future] = {}
+
+def _wait_for_cleanup(timeout: Optional[float]):
+    """Scheduler delay that also ends early when new cleanup work is entered."""
+    _cleanup_wakeup.wait(timeout)
+    _cleanup_wakeup.clear()
+
+# One scheduler, run by one thread, handles every delayed cleanup
+_cleanup_wakeup = threading.Event()
+_cleanup_scheduler = sched.scheduler(time.monotonic, _wait_for_cleanup)
+
+def _schedule_cleanup(execution_id: str):
+    """Forget an execution (or planning job) once EXECUTION_RETENTION_SECONDS have passed."""
+    _cleanup_scheduler.enter(EXECUTION_RETENTION_SECONDS, 1, _cleanup_entry, (execution_id,))
+    _cleanup_wakeup.set()
+
+def _cleanup_entry(execution_id: str):
+    execution_store.remove(execution_id)
+    plan_jobs.pop(execution_id, None)
+
+def _run_cleanup_scheduler():
+    """Run due cleanups; when nothing is scheduled, sleep until something is."""
+    while True:
+        _cleanup_scheduler.run()
+        _wait_for_cleanup(None)
+
+threading.Thread(target=_run_cleanup_scheduler, daemon=True, name="execution-cleanup").start()
+
+def _run_heartbeats():
+    """Push a heartbeat to every open stream from this one thread, instead of per-stream timeouts."""
+    while True:
+        time.sleep(SSE_HEARTBEAT_INTERVAL)
+        for channel in execution_store.channels():
+            channel.put(HEARTBEAT_FRAME)
+
+threading.Thread(target=_run_heartbeats, daemon=True, name="sse-heartbeat").start()
+
+# (whole second, its formatted local date/time); replaced as one tuple so threads never see a mix
+_timestamp_cache: tuple = (None, '')
+
+def iso_timestamp() -> str:
+    """Local time in datetime.now().isoformat() form, reformatting the date/time part once per second."""
+    global _timestamp_cache
+    seconds, nanos = divmod(time.time_ns(), 1_000_000_000)
+    cached_seconds, prefix = _timestamp_cache
+    if cached_seconds != seconds:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(seconds))
+        _timestamp_cache = (seconds, prefix)
+    return f"{prefix}.{nanos // 1000:06d}"
+
+def json_response(data: Any, status: int = 200) -> Response:
+    """Serialize data with dumps_json and wrap it in a JSON response."""
+    return Response(dumps_json(data), status=status, mimetype='application/json')
 
 def initialize_agent():
-    global agent_instance
-    if not settings.OPENAI_API_KEY: # TODO: Perhaps, we does not need to check it here.
-        raise ValueError("OPENAI_API_KEY not found")
-    
-    llm_interface = OpenAIInterface(
-        model_name=settings.DEFAULT_OPENAI_MODEL,
-        api_key=settings.OPENAI_API_KEY
-    )
-    
-    tool_registry = ToolRegistry()
-    # TODO: I shall find a way to make the tools get registered automatically or at once
-    tool_registry.register_tool(GetCurrentTimeTool())
-    tool_registry.register_tool(ListFilesTool())
-    tool_registry.register_tool(BrightnessControlTool())
-    tool_registry.register_tool(LocalLLMTool())
-    
-    agent_instance = AgentCore(llm_interface=llm_interface, tool_registry=tool_registry)
+    """Build the shared agent and the serialized tool list; later calls are no-ops."""
+    global agent_instance, tools_json_bytes
+    with _agent_init_lock:
+        if agent_instance is not None:
+            return
+        
+        if not settings.OPENAI_API_KEY: # TODO: Perhaps, we does not need to check it here.
+            raise ValueError("OPENAI_API_KEY not found")
+        
+        llm_interface = OpenAIInterface(
+            model_name=settings.DEFAULT_OPENAI_MODEL,
+            api_key=settings.OPENAI_API_KEY
+        )
+        
+        tool_registry = ToolRegistry()
+        # TODO: I shall find a way to make the tools get registered automatically or at once
+        tool_registry.register_tool(GetCurrentTimeTool())
+        tool_registry.register_tool(ListFilesTool())
+        tool_registry.register_tool(BrightnessControlTool())
+        tool_registry.register_tool(LocalLLMTool())
+        
+        tools_json_bytes = dumps_json({'tools': tool_registry.get_all_tools_info()})
+        # Published last: a non-None agent_instance means everything above is ready
+        agent_instance = AgentCore(llm_interface=llm_interface, tool_registry=tool_registry)
+
+# Build the agent once at startup so no request pays the construction cost
+initialize_agent()
 
 @app.route('/')
 def index():
@@ -52,44 +365,69 @@ def index():
 
 @app.route('/api/plan', methods=['POST'])
 def create_plan():
+    """Return a cached plan right away, or start planning and return a plan_id to poll"""
     try:
         data = request.get_json()
         query = data.get('query', '').strip()
         
         if not query:
-            return jsonify({'error': 'Query is required'}), 400
-        
-        if not agent_instance:
-            initialize_agent()
+            return json_response({'error': 'Query is required'}, 400)
 
-        # Create execution plan only
-        plan_data = agent_instance._create_execution_plan(query)
+        # Reuse a recent plan for the same query without queueing any work
+        plan_data = plan_cache.get(PlanCache.key(query))
+        if plan_data is not None:
+            return json_response(_plan_response(plan_data))
 
-        if not plan_data:
-            return jsonify({'error': 'Failed to create execution plan'}), 500
-        
-        # Include tool information in the response
-        relevant_tools = plan_data.get('tools', [])
-        tools_info = {
-            tool_name: agent_instance.tool_registry.get_tool(tool_name).get_tool_info()
-            for tool_name in relevant_tools
-        }
-        
-        return jsonify({
-            'plan': plan_data,
-            'tools': tools_info
-        })
+        # Planning takes seconds of LLM time, so it runs on the planning pool
+        plan_id = str(uuid.uuid4())
+        plan_jobs[plan_id] = planning_executor.submit(_create_plan_response, query)
+        plan_jobs[plan_id].add_done_callback(lambda _: _schedule_cleanup(plan_id))
+
+        return json_response({'plan_id': plan_id, 'status': 'pending'}, 202)
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
+
+@app.route('/api/plan/<plan_id>')
+def get_plan(plan_id):
+    """Poll a planning job started by /api/plan"""
+    job = plan_jobs.get(plan_id)
+    if job is None:
+        return json_response({'error': 'Plan not found'}, 404)
+    
+    if not job.done():
+        return json_response({'plan_id': plan_id, 'status': 'pending'}, 202)
+    
+    error = job.exception()
+    if error is not None:
+        return json_response({'plan_id': plan_id, 'status': 'failed', 'error': str(error)}, 500)
+    
+    return json_response({'plan_id': plan_id, 'status': 'completed', **job.result()})
+
+def _create_plan_response(query: str) -> dict:
+    """Create (and cache) an execution plan for a query; runs on the planning pool."""
+    plan_data = agent_instance._create_execution_plan(query)
+
+    if not plan_data:
+        raise ValueError('Failed to create execution plan')
+
+    plan_cache.put(PlanCache.key(query), plan_data)
+    return _plan_response(plan_data)
+
+def _plan_response(plan_data: dict) -> dict:
+    """The plan together with info for the tools it uses."""
+    relevant_tools = plan_data.get('tools', [])
+    tool_registry = agent_instance.tool_registry
+    tools_info = {tool_name: tool_registry.get_tool_info(tool_name) for tool_name in relevant_tools}
+    
+    return {
+        'plan': plan_data,
+        'tools': tools_info
+    }
     
 @app.route('/api/tools')
 def get_available_tools():
-    if not agent_instance:
-        initialize_agent()
-    
-    tools = agent_instance.tool_registry.get_all_tools_info()
-    return jsonify({'tools': tools})
+    return Response(tools_json_bytes, mimetype='application/json')
 
 @app.route('/execute.html')
 def execute_page():
@@ -105,86 +443,101 @@ def start_execution():
         query = data.get('query', '')
         
         if not plan_data:
-            return jsonify({'error': 'Plan data is required'}), 400
-        
-        if not agent_instance:
-            initialize_agent()
+            return json_response({'error': 'Plan data is required'}, 400)
         
         # Generate unique execution ID
         execution_id = str(uuid.uuid4())
         
-        # Initialize execution state
-        execution_states[execution_id] = {
+        # Initialize execution state and its update channel
+        execution_store.add(execution_id, {
             'id': execution_id,
             'query': query,
             'plan': plan_data,
             'status': 'starting',
-            'started_at': datetime.now().isoformat(),
+            'started_at': iso_timestamp(),
             'current_step': None,
             'completed_steps': [],
-            'step_results': {},
+            # One result slot per planned step, filled in place as steps finish
+            'step_results': {
+                step['id']: {'step_id': step['id'], 'success': False, 'result': None, 'executed': False}
+                for step in plan_data.get('plan', []) if 'id' in step
+            },
             'error': None
-        }
-        
-        # Create event queue for this execution
-        execution_queues[execution_id] = queue.Queue()
+        }, SseChannel())
         
-        # Start execution in background thread
-        thread = threading.Thread(
-            target=execute_plan_with_updates,
-            args=(execution_id, plan_data),
-            daemon=True
-        )
-        thread.start()
+        # Run the execution on the bounded worker pool
+        execution_executor.submit(execute_plan_with_updates, execution_id, plan_data)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'execution_id': execution_id,
             'status': 'started'
         })
     
     except Exception as e:
-        return jsonify({'error': str(e)}), 500
+        return json_response({'error': str(e)}, 500)
 
 @app.route('/api/execution/<execution_id>/status')
 def get_execution_status(execution_id):
     """Get current execution status and step results"""
-    if execution_id not in execution_states:
-        return jsonify({'error': 'Execution not found'}), 404
+    status = execution_store.state_json(execution_id)
+    if status is None:
+        return json_response({'error': 'Execution not found'}, 404)
+    
+    # The revision changes with every state update, so it works as an ETag for polling clients
+    revision, state_json = status
+    etag = f'"{revision}"'
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={'ETag': etag})
     
-    return jsonify(execution_states[execution_id])
+    return Response(state_json, mimetype='application/json', headers={'ETag': etag})
 
 @app.route('/api/execution/<execution_id>/stream')
 def stream_execution_updates(execution_id):
     """Server-Sent Events stream for real-time execution updates"""
-    if execution_id not in execution_queues:
-        return jsonify({'error': 'Execution not found'}), 404
+    channel = execution_store.get_channel(execution_id)
+    if channel is None:
+        return json_response({'error': 'Execution not found'}, 404)
     
     def event_stream():
-        event_queue = execution_queues[execution_id]
+        # Take over the channel before reading the state, so no update falls in between
+        generation = channel.attach()
         
         # Send initial state
-        if execution_id in execution_states:
-            yield f"data: {json.dumps(execution_states[execution_id])}\n\n"
+        status = execution_store.state_json(execution_id)
+        if status is not None:
+            yield b"data: " + status[1] + b"\n\n"
         
-        # Stream updates
-        while execution_id in execution_queues:
-            try:
-                # Wait for new updates with timeout
-                update = event_queue.get(timeout=1.0)
-                yield f"data: {json.dumps(update)}\n\n"
-                
-                # Clean up completed executions
-                if update.get('status') in ['completed', 'failed']:
-                    break
-                    
-            except queue.Empty:
-                # Send heartbeat to keep connection alive
-                yield f"data: {json.dumps({'type': 'heartbeat'})}\n\n"
+        # Stream updates (and shared heartbeats) as they are published; frames arrive
+        # pre-encoded, and the channel is closed when the execution ends or is dropped
+        while True:
+            frames = channel.drain(None, SSE_MAX_BATCH, generation)
+            if frames is None:
+                return  # Superseded by a reconnected stream
+            
+            if not frames:
+                continue
+            
+            # Give a burst of fast steps a moment to land in the same write
+            if len(frames) < SSE_MAX_BATCH and frames[-1] is not None:
+                time.sleep(SSE_FLUSH_INTERVAL)
+                frames += channel.drain(0, SSE_MAX_BATCH - len(frames), generation) or []
+            
+            closed = None in frames
+            if closed:
+                del frames[frames.index(None):]
+            
+            # One chunk (and one socket write) per batch
+            if frames:
+                yield b"".join(frames)
+            if closed:
+                return
     
+    # The generator yields ready-made bytes, so Werkzeug can pass them through untouched
     return Response(
         event_stream(),
         mimetype='text/event-stream',
+        direct_passthrough=True,
         headers={
             'Cache-Control': 'no-cache',
             'Connection': 'keep-alive',
@@ -195,21 +548,19 @@ def stream_execution_updates(execution_id):
 @app.route('/api/execution/<execution_id>', methods=['DELETE'])
 def stop_execution(execution_id):
     """Stop a running execution"""
-    if execution_id in execution_states:
-        execution_states[execution_id]['status'] = 'stopped'
+    if execution_store.update(execution_id, {'status': 'stopped'}) is not None:
         _send_update(execution_id, {
             'type': 'execution_stopped',
             'status': 'stopped',
-            'stopped_at': datetime.now().isoformat()
+            'stopped_at': iso_timestamp()
         })
     
-    return jsonify({'success': True})
+    return json_response({'success': True})
 
 def execute_plan_with_updates(execution_id: str, plan_data: dict):
     """Execute plan with real-time updates"""
     try:
         # Update status to running
-        execution_states[execution_id]['status'] = 'running'
         _send_update(execution_id, {
             'type': 'execution_started',
             'status': 'running'
@@ -220,15 +571,19 @@ def execute_plan_with_updates(execution_id: str, plan_data: dict):
             if step_id == 'execution':
                 # Handle execution-level events
                 if event_type == 'started':
-                    execution_states[execution_id]['status'] = 'running'
+                    execution_store.update(execution_id, {'status': 'running'})
                 elif event_type == 'completed':
-                    execution_states[execution_id]['status'] = 'completed'
-                    execution_states[execution_id]['result'] = data.get('result')
-                    execution_states[execution_id]['completed_at'] = data.get('completed_at')
+                    execution_store.update(execution_id, {
+                        'status': 'completed',
+                        'result': data.get('result'),
+                        'completed_at': data.get('completed_at')
+                    })
                 elif event_type == 'failed':
-                    execution_states[execution_id]['status'] = 'failed'
-                    execution_states[execution_id]['error'] = data.get('error')
-                    execution_states[execution_id]['failed_at'] = data.get('failed_at')
+                    execution_store.update(execution_id, {
+                        'status': 'failed',
+                        'error': data.get('error'),
+                        'failed_at': data.get('failed_at')
+                    })
                 
                 _send_update(execution_id, {
                     'type': f'execution_{event_type}',
@@ -237,7 +592,6 @@ def execute_plan_with_updates(execution_id: str, plan_data: dict):
             else:
                 # Handle step-level events
                 if event_type == 'started':
-                    execution_states[execution_id]['current_step'] = step_id
                     _send_update(execution_id, {
                         'type': 'step_started',
                         'step_id': step_id,
@@ -246,66 +600,77 @@ def execute_plan_with_updates(execution_id: str, plan_data: dict):
                     })
                 elif event_type in ['completed', 'failed']:
                     # On completion or failed, the status of all steps needs to be updated
-                    step_result = {
-                        'step_id': step_id,
-                        'success': data.get('success', False),
-                        'result': data.get('result'),
-                        'executed': data.get('executed', False)
-                    }
+                    with execution_store.locked(execution_id) as state:
+                        if state is None:
+                            return
+                        
+                        # Fill the step's slot (preallocated in start_execution) in place
+                        step_result = state['step_results'].get(step_id)
+                        if step_result is None:
+                            step_result = state['step_results'][step_id] = {'step_id': step_id}
+                        step_result['success'] = data.get('success', False)
+                        step_result['result'] = data.get('result')
+                        step_result['executed'] = data.get('executed', False)
+                        
+                        if data.get('success'):
+                            state['completed_steps'].append(step_id)
+                        
+                        update = {'type': 'step_completed', **step_result}
                     
-                    execution_states[execution_id]['step_results'][step_id] = step_result
-                    if data.get('success'):
-                        execution_states[execution_id]['completed_steps'].append(step_id)
-                    
-                    _send_update(execution_id, {
-                        'type': 'step_completed',
-                        **step_result
-                    })
-        
-        # Create agent and execute with callback
-        agent = AgentCore(
-            llm_interface=agent_instance.llm_interface,
-            tool_registry=agent_instance.tool_registry
-        )
+                    _send_update(execution_id, update)
         
-        # Execute the plan with callback
-        result = agent.execute_plan_with_callback(plan_data, step_callback)
+        # Take an agent from the pool and execute with callback
+        agent = _acquire_agent()
+        try:
+            result = agent.execute_plan_with_callback(plan_data, step_callback)
+        finally:
+            _release_agent(agent)
         
     except Exception as e:
         # Error handling remains the same
         error_msg = str(e)
-        execution_states[execution_id]['status'] = 'failed'
-        execution_states[execution_id]['error'] = error_msg
-        execution_states[execution_id]['failed_at'] = datetime.now().isoformat()
         
+        # _send_update records status, error and failed_at on the state as well
         _send_update(execution_id, {
             'type': 'execution_failed',
             'status': 'failed',
             'error': error_msg,
-            'failed_at': execution_states[execution_id]['failed_at']
+            'failed_at': iso_timestamp()
         })
     
     finally:
-        # Cleanup remains the same
-        def cleanup():
-            time.sleep(60)
-            if execution_id in execution_states:
-                del execution_states[execution_id]
-            if execution_id in execution_queues:
-                del execution_queues[execution_id]
-        
-        threading.Thread(target=cleanup, daemon=True).start()
+        _schedule_cleanup(execution_id)
+
+def _acquire_agent() -> AgentCore:
+    """Return an idle pooled agent, or build one that shares the global LLM and tools."""
+    try:
+        return agent_pool.pop()
+    except IndexError:
+        return AgentCore(
+            llm_interface=agent_instance.llm_interface,
+            tool_registry=agent_instance.tool_registry
+        )
+
+def _release_agent(agent: AgentCore):
+    """Reset an agent after its execution and keep it for reuse if the pool has room."""
+    agent.reset_execution_state()
+    if len(agent_pool) < AGENT_POOL_SIZE:
+        agent_pool.append(agent)
 
 def _send_update(execution_id: str, update_data: dict):
-    """Send update to execution queue"""
-    if execution_id in execution_queues:
-        try:
-            # Update the main state
-            for key, value in update_data.items():
-                if key not in ['type']:  # Don't store the 'type' field in state
-                    execution_states[execution_id][key] = value
-            
-            # Send to queue for streaming
-            execution_queues[execution_id].put(update_data)
-        except Exception as e:
-            print(f"Error sending update for execution {execution_id}: {e}")
\ No newline at end of file
+    """Send update to the execution's SSE channel"""
+    try:
+        # Update the main state (without the 'type' field) under the shard lock
+        channel = execution_store.update(
+            execution_id, {key: value for key, value in update_data.items() if key != 'type'}
+        )
+        if channel is None:
+            return
+        
+        # Encode the frame once here, so the stream only writes bytes
+        channel.put(sse_frame(update_data))
+        # AgentCore's execution_completed payload carries no status, so end on the event type
+        if update_data.get('type') in ('execution_completed', 'execution_failed'):
+            channel.close()
+    except Exception as e:
+        print(f"Error sending update for execution {execution_id}: {e}")
\ No newline at end of file
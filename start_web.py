@@ -5,13 +5,26 @@ Web interface startup script for LLM Agent Planning Interface
 
 import sys
 import os
+import socket
+from werkzeug.serving import WSGIRequestHandler
 
 # Add the project root to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from src.web_api import app
+from src.config import settings
+
+class NoDelayRequestHandler(WSGIRequestHandler):
+    """Disable Nagle's algorithm so small SSE frames are sent immediately instead of being held back."""
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
 
 if __name__ == '__main__':
+    # Development server only. For production, serve src.web_api:app with a
+    # threaded WSGI server instead (see "Web Interface" in the README)
     print("Starting LLM Agent Planning Interface...")
     print("Open your browser to: http://localhost:5001")
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    app.run(debug=settings.WEB_DEBUG, threaded=True, host='0.0.0.0', port=5001,
+            request_handler=NoDelayRequestHandler)
\ No newline at end of file
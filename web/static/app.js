@@ -117,7 +117,12 @@ class PlanningInterface {
                 body: JSON.stringify({ query })
             });
 
-            const data = await response.json();
+            let data = await response.json();
+
+            // Planning runs in the background: poll until the plan is ready
+            if (data.plan_id) {
+                data = await this.waitForPlan(data.plan_id);
+            }
 
             if (data.plan) {  // ← Check for plan instead of success
                 // Store the plan and query for execution
@@ -145,6 +150,19 @@ class PlanningInterface {
         }
     }
 
+    async waitForPlan(planId) {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, 500));
+
+            const response = await fetch(`/api/plan/${planId}`);
+            const data = await response.json();
+
+            if (data.status !== 'pending') {
+                return data;
+            }
+        }
+    }
+
     displayPlan(planData, originalQuery) {
         const steps = planData.plan || [];
         